@@ -5,111 +5,313 @@ browser engine (Chromium via Playwright), then output a single merged PDF.
 No data is sent online - everything runs 100% locally.
 
 Requirements:
-    pip install ebooklib playwright pypdf beautifulsoup4 Pillow
+    pip install playwright pikepdf Pillow img2pdf lxml selectolax
     playwright install chromium
 """
 
 import sys
 import os
+import html
+import io
+import asyncio
 import shutil
 import tempfile
+import threading
+import urllib.parse
+import warnings
 import zipfile
+import posixpath
 import re
+from concurrent.futures import ThreadPoolExecutor, as_completed
 from pathlib import Path
-from xml.etree import ElementTree as ET
 
-from playwright.sync_api import sync_playwright
-from pypdf import PdfWriter, PdfReader
-from PIL import Image
+import lxml.html
+import img2pdf
+import pikepdf
+from lxml import etree
+from playwright.async_api import async_playwright
+from PIL import Image, ImageOps
+
+try:
+    from selectolax.lexbor import LexborHTMLParser
+except ImportError:  # optional fast path; lxml.html is used instead
+    LexborHTMLParser = None
+
+CONTAINER_NS = {'c': 'urn:oasis:names:tc:opendocument:xmlns:container'}
+OPF_NS = {
+    'opf': 'http://www.idpf.org/2007/opf',
+    'dc': 'http://purl.org/dc/elements/1.1/',
+}
+NAV_NS = {
+    'x': 'http://www.w3.org/1999/xhtml',
+    'epub': 'http://www.idpf.org/2007/ops',
+}
+NCX_NS = {'ncx': 'http://www.daisy.org/z3986/2005/ncx/'}
+
+# Content documents are read straight out of the ZIP; everything else
+# (stylesheets, fonts, images) is written to disk for Chromium to load.
+DOCUMENT_EXTENSIONS = ('.xhtml', '.html', '.htm', '.opf', '.ncx')
+
+# Copy buffer for extraction; the zipfile default issues many tiny reads
+COPY_BUFFER_SIZE = 1024 * 1024
+
+# Chromium switches that trim work irrelevant to headless print-to-PDF.
+# Playwright already launches without the sandbox and with most of the
+# usual trimming switches (--disable-extensions, --mute-audio, its own
+# --disable-features list, ...); repeating --disable-features here would
+# replace that list rather than extend it.
+CHROMIUM_ARGS = [
+    '--disable-gpu',
+    '--run-all-compositor-stages-before-draw',
+]
+
+# Viewport matching the page size at 96 DPI (Chromium default); this
+# prevents small-screen @media queries from activating
+PAGE_VIEWPORT = {'width': 528, 'height': 816}
+
+# Write buffer for the combined HTML
+WRITE_BUFFER_SIZE = 1024 * 1024
+
+# Books smaller than this per extra part are rendered as a single page;
+# splitting them costs more in page setup than it saves
+MIN_CHUNK_BYTES = 256 * 1024
+
+# Internal chapter link, e.g. "chapter-001.xhtml" or "chapter-001.xhtml#p3"
+_XHTML_HREF_RE = re.compile(r'([^#]+?)\.xhtml(?:#.*)?', re.DOTALL)
+
+# In-document link as serialized in a chapter body
+_ANCHOR_HREF_RE = re.compile(r'href="#([^"]+)"')
+
+# Self-closed non-void element, e.g. <title/> or <script src="a.js"/>
+_SELF_CLOSING_RE = re.compile(
+    rb'<(?!(?:area|base|br|col|embed|hr|img|input|link|meta|param|source|track|wbr)[\s/>])'
+    rb'([a-zA-Z][\w:.-]*)(\s[^<>]*?)?\s*/>', re.IGNORECASE)
+
+
+class _ThreadParsers(threading.local):
+    """lxml parsers, one set per thread.
+
+    An lxml parser instance handles one document at a time, so sharing
+    one between the chapter workers would serialize their parsing.
+    """
+
+    def __init__(self):
+        # EPUB XML is untrusted: never expand entities or fetch external
+        # resources (lxml < 5 resolves external file entities by default)
+        self.xml = etree.XMLParser(resolve_entities=False, no_network=True)
+        # TOC documents are best-effort: a sloppy nav/NCX must not fail the book
+        self.recover = etree.XMLParser(recover=True, resolve_entities=False, no_network=True)
+        self.html = lxml.html.HTMLParser(encoding='utf-8')
+
+
+_PARSERS = _ThreadParsers()
+
+
+def extract_epub(zf, output_dir):
+    """Extract the EPUB's linked assets (CSS, fonts, images) to a directory.
+
+    Content documents are skipped: they are read on demand from the open
+    archive, so only the files Chromium fetches via file:// hit the disk.
+    """
+    root = os.path.realpath(output_dir)
+    for info in zf.infolist():
+        name = info.filename
+        if (info.is_dir() or name == 'mimetype' or name.startswith('META-INF/')
+                or name.lower().endswith(DOCUMENT_EXTENSIONS)):
+            continue
+        target = os.path.realpath(os.path.join(root, name))
+        # Refuse entries that would escape the output directory
+        if not target.startswith(root + os.sep):
+            continue
+        os.makedirs(os.path.dirname(target), exist_ok=True)
+        with zf.open(info) as src, open(target, 'wb') as dst:
+            shutil.copyfileobj(src, dst, COPY_BUFFER_SIZE)
+
+
+def _inside_archive(name):
+    """True if an archive path stays inside the directory it is extracted to."""
+    name = posixpath.normpath(name)
+    return not (name.startswith('/') or name == '..' or name.startswith('../'))
+
 
+def archive_members(zf):
+    """Set of member names, leaving out any that would escape the extraction directory."""
+    return frozenset(name for name in zf.namelist() if _inside_archive(name))
 
-def extract_epub(epub_path, output_dir):
-    """Extract EPUB (which is just a ZIP) to a directory."""
-    with zipfile.ZipFile(epub_path, 'r') as z:
-        z.extractall(output_dir)
 
+def parse_opf(zf, members=None):
+    """Parse the OPF file to get spine order, manifest items, and metadata.
+
+    All returned paths (``full_path``, ``opf_dir``, the cover image) are
+    member names inside the EPUB archive. Spine items and the cover image
+    missing from the archive are dropped here, so callers need no further
+    existence checks. ``members`` is the archive's set of member names
+    from archive_members(), built from the ZIP if not given; paths
+    outside it (including any that climb out with "..") are ignored.
+    """
+    if members is None:
+        members = archive_members(zf)
 
-def parse_opf(extract_dir):
-    """Parse the OPF file to get spine order, manifest items, and metadata."""
     # Find the OPF file via container.xml
-    container_path = os.path.join(extract_dir, "META-INF", "container.xml")
-    if not os.path.exists(container_path):
+    if "META-INF/container.xml" not in members:
         raise FileNotFoundError("No META-INF/container.xml found - not a valid EPUB")
 
-    tree = ET.parse(container_path)
-    root = tree.getroot()
-    ns = {'c': 'urn:oasis:names:tc:opendocument:xmlns:container'}
-    rootfile_elem = root.find('.//c:rootfile', ns)
-    if rootfile_elem is None:
+    root = etree.fromstring(zf.read("META-INF/container.xml"), _PARSERS.xml)
+    rootfiles = root.xpath('.//c:rootfile/@full-path', namespaces=CONTAINER_NS)
+    if not rootfiles:
         raise ValueError("No rootfile found in container.xml")
 
-    opf_relative = rootfile_elem.get('full-path')
-    opf_path = os.path.join(extract_dir, opf_relative)
-    opf_dir = os.path.dirname(opf_path)
+    opf_path = rootfiles[0]
+    if not _inside_archive(opf_path):
+        raise ValueError(f"OPF path escapes the archive: {opf_path}")
+    opf_dir = posixpath.dirname(opf_path)
+    opf_prefix = opf_dir + '/' if opf_dir else ''
 
     # Parse the OPF
-    tree = ET.parse(opf_path)
-    root = tree.getroot()
-
-    # Handle OPF namespace
-    opf_ns = re.match(r'\{.*\}', root.tag)
-    ns_prefix = opf_ns.group(0) if opf_ns else ''
+    root = etree.fromstring(zf.read(opf_path), _PARSERS.xml)
 
     # Build manifest: id -> {href, media_type, properties}
-    manifest = {}
-    for item in root.iter(f'{ns_prefix}item'):
-        item_id = item.get('id')
-        href = item.get('href')
-        media_type = item.get('media-type', '')
-        properties = item.get('properties', '')
-        manifest[item_id] = {
-            'href': href,
-            'media_type': media_type,
-            'properties': properties,
-            'full_path': os.path.normpath(os.path.join(opf_dir, href))
+    manifest = {
+        item.get('id'): {
+            'href': item.get('href'),
+            'media_type': item.get('media-type', ''),
+            'properties': item.get('properties', ''),
+            'full_path': posixpath.normpath(opf_prefix + item.get('href')),
         }
+        for item in root.xpath('./opf:manifest/opf:item', namespaces=OPF_NS)
+    }
+
+    # Cover pages the OPF declares: a 'cover' manifest property or an
+    # EPUB 2 <guide> reference of type "cover"
+    cover_pages = {
+        posixpath.normpath(opf_prefix + href.split('#')[0])
+        for href in root.xpath('./opf:guide/opf:reference[@type="cover"]/@href', namespaces=OPF_NS)
+    }
 
     # Build spine order
-    spine = []
-    for itemref in root.iter(f'{ns_prefix}itemref'):
-        idref = itemref.get('idref')
-        if idref in manifest:
-            spine.append(manifest[idref])
+    spine = [
+        dict(manifest[idref], is_cover=('cover' in manifest[idref]['properties'].split()
+                                        or manifest[idref]['full_path'] in cover_pages))
+        for idref in root.xpath('./opf:spine/opf:itemref/@idref', namespaces=OPF_NS)
+        if idref in manifest and manifest[idref]['full_path'] in members
+    ]
 
     # Get metadata
     metadata = {}
-    dc_ns = 'http://purl.org/dc/elements/1.1/'
-    for elem in root.iter(f'{{{dc_ns}}}title'):
-        metadata['title'] = elem.text
-    for elem in root.iter(f'{{{dc_ns}}}creator'):
-        metadata['creator'] = elem.text
+    titles = root.xpath('.//dc:title/text()', namespaces=OPF_NS)
+    if titles:
+        metadata['title'] = titles[0]
+    creators = root.xpath('.//dc:creator/text()', namespaces=OPF_NS)
+    if creators:
+        metadata['creator'] = creators[0]
 
     # Find cover image
     cover_image_path = None
     for item_id, item_data in manifest.items():
-        if 'cover-image' in item_data.get('properties', ''):
+        if 'cover-image' in item_data.get('properties', '') and item_data['full_path'] in members:
             cover_image_path = item_data['full_path']
             break
     # Fallback: check for meta name="cover"
     if not cover_image_path:
-        for meta in root.iter(f'{ns_prefix}meta'):
-            if meta.get('name') == 'cover':
-                cover_id = meta.get('content')
-                if cover_id in manifest:
-                    cover_image_path = manifest[cover_id]['full_path']
-                    break
+        for cover_id in root.xpath('.//opf:meta[@name="cover"]/@content', namespaces=OPF_NS):
+            if cover_id in manifest and manifest[cover_id]['full_path'] in members:
+                cover_image_path = manifest[cover_id]['full_path']
+                break
+
+    toc = parse_toc(zf, manifest, members)
+
+    return spine, manifest, metadata, opf_dir, cover_image_path, toc
 
-    return spine, manifest, metadata, opf_dir, cover_image_path
 
+def parse_toc(zf, manifest, members):
+    """Read the table of contents as a tree of ``(title, anchor_id, children)``.
 
-def create_cover_pdf(cover_image_path, output_path, page_width_in=5.5, page_height_in=8.5):
+    Prefers the EPUB 3 nav document and falls back to the EPUB 2 NCX.
+    ``anchor_id`` is the target chapter's anchor in the combined HTML (or
+    None for entries without a link); fragments within a chapter are
+    dropped, as they are for rewritten links.
+    """
+    for item in manifest.values():
+        if 'nav' in item['properties'].split() and item['full_path'] in members:
+            root = _parse_toc_document(zf, item['full_path'])
+            if root is None:
+                continue
+            navs = root.xpath('//x:nav[contains(concat(" ", @epub:type, " "), " toc ")]', namespaces=NAV_NS)
+            if navs:
+                return _nav_entries(navs[0])
+
+    for item in manifest.values():
+        if item['media_type'] == 'application/x-dtbncx+xml' and item['full_path'] in members:
+            root = _parse_toc_document(zf, item['full_path'])
+            if root is not None:
+                return _ncx_entries(root.find('ncx:navMap', NCX_NS))
+
+    return []
+
+
+def _parse_toc_document(zf, name):
+    """Parse a nav or NCX document; None if nothing usable can be recovered."""
+    try:
+        return etree.fromstring(zf.read(name), _PARSERS.recover)
+    except etree.XMLSyntaxError:
+        return None
+
+
+def _nav_entries(parent):
+    """TOC entries from the <ol> directly under a nav or <li> element."""
+    entries = []
+    for li in parent.xpath('./x:ol/x:li', namespaces=NAV_NS):
+        labels = li.xpath('./x:a | ./x:span', namespaces=NAV_NS)
+        if not labels:
+            continue
+        title = ' '.join(labels[0].xpath('string()').split())
+        href = labels[0].get('href')
+        anchor = _chapter_anchor(href.split('#')[0]) if href else None
+        entries.append((title, anchor, _nav_entries(li)))
+    return entries
+
+
+def _ncx_entries(parent):
+    """TOC entries from the navPoints directly under an NCX element."""
+    entries = []
+    if parent is None:
+        return entries
+    for nav_point in parent.findall('ncx:navPoint', NCX_NS):
+        title = ' '.join(nav_point.xpath('string(./ncx:navLabel/ncx:text)', namespaces=NCX_NS).split())
+        src = nav_point.xpath('string(./ncx:content/@src)', namespaces=NCX_NS)
+        anchor = _chapter_anchor(src.split('#')[0]) if src else None
+        entries.append((title, anchor, _ncx_entries(nav_point)))
+    return entries
+
+
+def _encode_image(img, format, **params):
+    """Encode a Pillow image to bytes in the given format."""
+    buf = io.BytesIO()
+    img.save(buf, format, **params)
+    return buf.getvalue()
+
+
+def create_cover_pdf(cover_image_path, output_path, page_width_in=5.5, page_height_in=8.5,
+                     resample=Image.LANCZOS, quality=75):
     """Create a full-bleed cover page PDF from the cover image.
 
     Scales the cover image to fill the entire page with no margins,
-    similar to how Calibre handles cover pages.
+    similar to how Calibre handles cover pages. ``resample`` is the Pillow
+    filter used for the final resize (e.g. ``Image.BICUBIC`` for speed)
+    and ``quality`` the JPEG quality of the embedded page image.
     """
+    # Page dimensions in pixels at 150 DPI (good balance of quality and size)
+    dpi = 150
+    page_w_px = int(page_width_in * dpi)
+    page_h_px = int(page_height_in * dpi)
+
     img = Image.open(cover_image_path)
 
+    # Let libjpeg decode large covers at a reduced DCT scale (1/2, 1/4, 1/8)
+    # while keeping at least 2x the page size for the final resize.
+    if img.format == 'JPEG':
+        img.draft('RGB', (page_w_px * 2, page_h_px * 2))
+
     # Convert to RGB if needed
     if img.mode in ('RGBA', 'P', 'LA'):
         bg = Image.new('RGB', img.size, (255, 255, 255))
@@ -121,39 +323,154 @@ def create_cover_pdf(cover_image_path, output_path, page_width_in=5.5, page_heig
         else:
             img = img.convert('RGB')
 
-    # Page dimensions in pixels at 150 DPI (good balance of quality and size)
-    dpi = 150
-    page_w_px = int(page_width_in * dpi)
-    page_h_px = int(page_height_in * dpi)
-
-    # Scale image to fit the page while maintaining aspect ratio
-    img_w, img_h = img.size
-    img_aspect = img_w / img_h
-    page_aspect = page_w_px / page_h_px
-
-    if img_aspect > page_aspect:
-        # Image is wider than page - fit to height, crop width
-        new_h = page_h_px
-        new_w = int(page_h_px * img_aspect)
-    else:
-        # Image is taller than page - fit to width, crop height
-        new_w = page_w_px
-        new_h = int(page_w_px / img_aspect)
-
-    img_resized = img.resize((new_w, new_h), Image.LANCZOS)
+    # Scale to cover the page and center-crop in a single resize, so no
+    # oversized intermediate image is allocated
+    img_fitted = ImageOps.fit(img, (page_w_px, page_h_px), method=resample, centering=(0.5, 0.5))
 
-    # Center crop to page size
-    left = (new_w - page_w_px) // 2
-    top = (new_h - page_h_px) // 2
-    img_cropped = img_resized.crop((left, top, left + page_w_px, top + page_h_px))
+    # Encode once and let img2pdf embed the stream as-is. The default JPEG
+    # quality of 75 matches what Pillow's PDF writer produced; flat-colour
+    # covers (at most 256 colours) are often smaller as a lossless indexed PNG.
+    if img_fitted.mode not in ('RGB', 'L'):
+        img_fitted = img_fitted.convert('RGB')
+    encoded = [_encode_image(img_fitted, 'JPEG', quality=quality)]
+    if img_fitted.mode == 'RGB' and img_fitted.getcolors(256) is not None:
+        encoded.append(_encode_image(img_fitted.convert('P', palette=Image.ADAPTIVE), 'PNG'))
 
     # Save as PDF
-    img_cropped.save(output_path, 'PDF', resolution=dpi)
+    layout = img2pdf.get_layout_fun((img2pdf.in_to_pt(page_width_in), img2pdf.in_to_pt(page_height_in)))
+    with open(output_path, 'wb') as f:
+        f.write(img2pdf.convert(min(encoded, key=len), layout_fun=layout))
 
     return output_path
 
 
-def is_cover_page(html_path, item):
+def _xhtml_document(content):
+    """Parse a content document as XML; returns None if it is not well-formed.
+
+    XHTML elements are moved out of their namespace and EPUB attributes
+    (epub:type) are dropped, so the tree serializes as plain HTML. Other
+    namespaces, such as inline SVG, keep their prefixes.
+    """
+    try:
+        root = etree.fromstring(content, _PARSERS.xml)
+    except etree.XMLSyntaxError:
+        return None
+    xhtml = '{%s}' % NAV_NS['x']
+    ops = '{%s}' % NAV_NS['epub']
+    for node in root.iter(etree.Element):
+        if node.tag.startswith(xhtml):
+            node.tag = node.tag[len(xhtml):]
+        for name in [name for name in node.attrib if name.startswith(ops)]:
+            del node.attrib[name]
+    etree.cleanup_namespaces(root)
+    return root
+
+
+def _expand_self_closing(content):
+    """Write self-closed non-void elements (``<title/>``) as start/end tag pairs."""
+    return _SELF_CLOSING_RE.sub(rb'<\1\2></\1>', content)
+
+
+def _lxml_document(content):
+    """Parse markup with lxml.html; returns None for an empty document."""
+    try:
+        return lxml.html.document_fromstring(content, parser=_PARSERS.html)
+    except etree.ParserError:
+        return None
+
+
+def _is_namespace_attr(name):
+    """True for the XHTML/EPUB namespace attributes that break HTML5 parsing."""
+    return name == 'xmlns' or name.startswith('xmlns:') or name == 'epub:type'
+
+
+def _xhtml_anchor(href):
+    """Map an internal link like "chapter-001.xhtml" to "#chapter-001"."""
+    match = _XHTML_HREF_RE.fullmatch(href)
+    return f'#{match.group(1)}' if match else None
+
+
+def _parse_cover_body(content):
+    """Return ``(text, has_img, body_class)`` for a page's <body>."""
+    doc = _xhtml_document(content)
+    if doc is None:
+        content = _expand_self_closing(content)
+        if LexborHTMLParser is not None:
+            body = LexborHTMLParser(content).body
+            if body is None:
+                return '', False, ''
+            return (body.text(deep=True), body.css_first('img') is not None,
+                    body.attributes.get('class') or '')
+        doc = _lxml_document(content)
+        if doc is None:
+            return '', False, ''
+
+    body = doc.find('body')
+    if body is None:
+        return '', False, ''
+    return body.xpath('string()'), bool(body.xpath('.//img')), body.get('class', '')
+
+
+def _parse_lexbor_chapter(content):
+    """_parse_chapter() for markup that is not XML, using selectolax."""
+    tree = LexborHTMLParser(content)
+    css_hrefs = [href for href in (node.attributes.get('href') or '' for node in tree.css('link[href]'))
+                 if href.lower().endswith('.css')]
+    body = tree.body
+    if body is None:
+        return css_hrefs, ''
+    # Single walk over the body: drop namespace attributes everywhere
+    # and rewrite links on <a> elements as they come up
+    for node in body.traverse():
+        attrs = node.attributes
+        for name in attrs:
+            if _is_namespace_attr(name):
+                del node.attrs[name]
+        if node.tag == 'a':
+            anchor = _xhtml_anchor(attrs.get('href') or '')
+            if anchor:
+                node.attrs['href'] = anchor
+    return css_hrefs, ''.join(child.html for child in body.iter(include_text=True))
+
+
+def _parse_chapter(content):
+    """Parse a chapter once and return ``(css_hrefs, body_html)``.
+
+    ``content`` is the raw document. Chapters are XHTML, so they are
+    parsed as XML; an HTML parser would treat a self-closed ``<title/>``
+    or ``<script/>`` as still open and lose the rest of the page. Only
+    documents that are not well-formed fall back to HTML parsing.
+
+    Internal .xhtml links in the body are rewritten to in-document
+    anchors and namespace attributes are dropped before serializing the
+    body's inner HTML.
+    """
+    doc = _xhtml_document(content)
+    if doc is None:
+        content = _expand_self_closing(content)
+        if LexborHTMLParser is not None:
+            return _parse_lexbor_chapter(content)
+        doc = _lxml_document(content)
+        if doc is None:
+            return [], ''
+
+    css_hrefs = [href for href in doc.xpath('//link/@href') if href.lower().endswith('.css')]
+    body = doc.find('body')
+    if body is None:
+        return css_hrefs, ''
+    for node in body.iter(etree.Element):
+        for name in [name for name in node.attrib if _is_namespace_attr(name)]:
+            del node.attrib[name]
+        if node.tag == 'a':
+            anchor = _xhtml_anchor(node.get('href', ''))
+            if anchor:
+                node.set('href', anchor)
+    body_html = html.escape(body.text or '', quote=False) + ''.join(
+        lxml.html.tostring(child, encoding='unicode') for child in body)
+    return css_hrefs, body_html
+
+
+def is_cover_page(zf, item):
     """Detect if a spine item is a cover page that wraps the cover image.
 
     Many EPUBs include a cover.xhtml that simply wraps the cover image in
@@ -172,19 +489,13 @@ def is_cover_page(html_path, item):
 
     # Read and verify it's just wrapping an image
     try:
-        with open(html_path, 'r', encoding='utf-8', errors='replace') as f:
-            content = f.read()
-        body_match = re.search(r'<body[^>]*>(.*?)</body>', content, re.DOTALL | re.IGNORECASE)
-        if body_match:
-            body = body_match.group(1).strip()
-            # A cover page typically has minimal content: just a div with an img
-            text_content = re.sub(r'<[^>]+>', '', body).strip()
-            has_img = bool(re.search(r'<img\s', body, re.IGNORECASE))
-            # If body text is very short (just whitespace/alt text) and has an image
-            if has_img and len(text_content) < 100:
-                return True
+        text_content, has_img, body_class = _parse_cover_body(zf.read(item['full_path']))
+        # A cover page typically has minimal content: just a div with an img.
+        # If body text is very short (just whitespace/alt text) and has an image
+        if has_img and len(text_content.strip()) < 100:
+            return True
         # Also check for body class="cover"
-        if re.search(r'<body[^>]*class="[^"]*cover[^"]*"', content, re.IGNORECASE):
+        if 'cover' in body_class.lower():
             return True
     except Exception:
         pass
@@ -192,87 +503,139 @@ def is_cover_page(html_path, item):
     return False
 
 
-def build_combined_html(spine, opf_dir, skip_cover=False):
+def _chapter_anchor(href):
+    """Anchor ID of a chapter's <div> in the combined HTML."""
+    filename = posixpath.basename(href)
+    return filename.replace('.xhtml', '').replace('.html', '')
+
+
+def _split_chunks(sizes, count):
+    """Split indices into ``count`` contiguous runs of roughly equal total size."""
+    total = sum(sizes)
+    groups = [[]]
+    done = 0
+    for index, size in enumerate(sizes):
+        if groups[-1] and len(groups) < count and done >= total * len(groups) / count:
+            groups.append([])
+        groups[-1].append(index)
+        done += size
+    return groups
+
+
+def _process_chapter(zf, members, extract_dir, i, item):
+    """Turn one spine chapter into a body <div> for the combined HTML.
+
+    The <div> is written to its own file under ``_chapters`` so the
+    combined document can be streamed together without holding the whole
+    book in memory. Returns ``(i, body_path, body_size, css_set)`` so
+    results gathered out of order can be put back in spine order.
+    """
+    html_path = item['full_path']
+    # One parse yields the stylesheet links and the cleaned-up body
+    css_hrefs, body_html = _parse_chapter(zf.read(html_path))
+
+    css_set = set()
+    for css_href in css_hrefs:
+        css_name = posixpath.normpath(posixpath.join(posixpath.dirname(html_path), css_href))
+        if css_name in members:
+            css_set.add(os.path.join(extract_dir, css_name))
+
+    # Create an anchor ID from the filename so TOC links resolve
+    anchor_id = _chapter_anchor(item['href'])
+
+    # Use CSS class for page breaks (more reliable than inline styles)
+    cls = 'epub-chapter-break' if i > 0 else 'epub-chapter-first'
+    body_path = os.path.join(extract_dir, '_chapters', f'{i:05d}.html')
+    with open(body_path, 'w', encoding='utf-8') as f:
+        body_size = f.write(f'<div id="{anchor_id}" class="{cls}">\n{body_html}\n</div>\n')
+    return i, body_path, body_size, css_set
+
+
+def build_combined_html(zf, spine, opf_dir, extract_dir, skip_cover=False, max_chunks=1, members=None):
     """Combine all spine chapters into a single HTML document.
 
     This ensures that internal links (e.g., TOC links to chapter-001.xhtml)
     resolve correctly within the PDF, since they become anchor links
     within the same document.
 
+    Large books can instead be split into up to ``max_chunks`` consecutive
+    parts so they render in parallel. Links to a chapter in another part
+    point at that part's file; merge_pdfs() turns them back into internal
+    links once the parts are joined.
+
     IMPORTANT: The output must be saved as .html (not .xhtml) to avoid
     Chromium's strict XHTML parser which silently fails on EPUB namespace
     attributes, resulting in an empty body and broken pagination.
 
     Args:
+        zf: Open ZipFile of the EPUB; chapters are read from it directly.
         spine: List of spine items from the OPF.
-        opf_dir: Directory containing the OPF and content files.
+        opf_dir: Archive directory containing the OPF and content files.
+        extract_dir: Directory the EPUB assets were extracted to; the
+                     combined HTML is written alongside them.
         skip_cover: If True, detect and skip cover HTML pages from the spine
                     (to avoid duplicating the generated full-bleed cover).
-    """
-    # Collect all CSS files referenced by any chapter
-    all_css = set()
-    all_bodies = []
-    skipped_cover = False
-
-    for i, item in enumerate(spine):
-        html_path = item['full_path']
-        if not os.path.exists(html_path):
-            continue
-
-        # Skip cover HTML pages when we've generated our own cover PDF
-        if skip_cover and not skipped_cover and is_cover_page(html_path, item):
-            skipped_cover = True
-            print(f"    Skipping cover page: {os.path.basename(item['href'])} (already generated full-bleed cover)")
-            continue
-
-        with open(html_path, 'r', encoding='utf-8', errors='replace') as f:
-            content = f.read()
+        max_chunks: Upper bound on the number of HTML parts to produce.
+        members: The archive's set of member names from archive_members().
 
-        # Extract CSS references from <link> tags
-        for match in re.finditer(r'<link[^>]+href=["\']([^"\']+\.css)["\']', content, re.IGNORECASE):
-            css_href = match.group(1)
-            css_full = os.path.normpath(os.path.join(os.path.dirname(html_path), css_href))
-            if os.path.exists(css_full):
-                all_css.add(css_full)
-
-        # Extract the <body> content
-        body_match = re.search(r'<body[^>]*>(.*?)</body>', content, re.DOTALL | re.IGNORECASE)
-        if body_match:
-            body_html = body_match.group(1)
+    Returns:
+        List of combined HTML paths, in reading order.
+    """
+    chapters = list(enumerate(spine))
+
+    # Skip cover HTML pages when we've generated our own cover PDF. Covers
+    # flagged by the OPF are trusted as-is; otherwise only the first spine
+    # item, where EPUBs conventionally put the cover, is inspected.
+    if skip_cover and chapters:
+        flagged = [(i, item) for i, item in chapters if item.get('is_cover')]
+        if flagged:
+            cover = flagged[0]
+        elif is_cover_page(zf, chapters[0][1]):
+            cover = chapters[0]
         else:
-            head_end = re.search(r'</head>', content, re.IGNORECASE)
-            if head_end:
-                body_html = content[head_end.end():]
-                body_html = re.sub(r'</?html[^>]*>', '', body_html, flags=re.IGNORECASE)
-            else:
-                body_html = content
-
-        # Create an anchor ID from the filename so TOC links resolve
-        filename = os.path.basename(item['href'])
-        anchor_id = filename.replace('.xhtml', '').replace('.html', '')
-
-        # Rewrite internal links: href="chapter-001.xhtml" -> href="#chapter-001"
-        body_html = re.sub(
-            r'href="([^"#]+?\.xhtml)(?:#([^"]*?))?"',
-            lambda m: f'href="#{m.group(1).replace(".xhtml", "")}"',
-            body_html
-        )
-
-        # Strip XHTML namespace attributes that break HTML5 parsing
-        body_html = re.sub(r'\s+xmlns(?::\w+)?="[^"]*"', '', body_html)
-        body_html = re.sub(r'\s+epub:type="[^"]*"', '', body_html)
+            cover = None
+        if cover:
+            chapters.remove(cover)
+            print(f"    Skipping cover page: {os.path.basename(cover[1]['href'])} (already generated full-bleed cover)")
+
+    # Chapters are independent, so preprocess them concurrently; zipfile
+    # reads and most of the regex work release the GIL. Results are slotted
+    # back by spine index to keep reading order.
+    all_css = set()
+    if members is None:
+        members = archive_members(zf)
+    bodies = [None] * len(spine)
+    os.makedirs(os.path.join(extract_dir, '_chapters'), exist_ok=True)
+    with ThreadPoolExecutor() as pool:
+        futures = [pool.submit(_process_chapter, zf, members, extract_dir, i, item) for i, item in chapters]
+        for future in as_completed(futures):
+            i, body_path, body_size, css_set = future.result()
+            bodies[i] = (body_path, body_size)
+            all_css |= css_set
+    body_paths = [bodies[i][0] for i, item in chapters]
+    anchors = [_chapter_anchor(item['href']) for i, item in chapters]
+
+    # Split into parts of similar size, but only when each is big enough
+    # for parallel rendering to pay off
+    sizes = [bodies[i][1] for i, item in chapters]
+    chunk_count = max(1, min(max_chunks, sum(sizes) // MIN_CHUNK_BYTES))
+    groups = _split_chunks(sizes, chunk_count)
+    if len(groups) == 1:
+        filenames = ['_combined_epub.html']
+    else:
+        filenames = [f'_combined_epub_{k}.html' for k in range(len(groups))]
+    anchor_files = {anchors[index]: filenames[k] for k, group in enumerate(groups) for index in group}
 
-        # Use CSS class for page breaks (more reliable than inline styles)
-        cls = 'epub-chapter-break' if i > 0 else 'epub-chapter-first'
-        all_bodies.append(f'<div id="{anchor_id}" class="{cls}">\n{body_html}\n</div>\n')
+    css_uris = [Path(css).as_uri() for css in sorted(all_css)]
+    css_links = '\n    '.join(f'<link rel="stylesheet" type="text/css" href="{uri}"/>' for uri in css_uris)
 
     # Build the combined HTML document (as HTML5, NOT XHTML)
-    combined_html = f"""<!DOCTYPE html>
+    head = f"""<!DOCTYPE html>
 <html lang="en">
 <head>
     <meta charset="utf-8"/>
     <title>Combined EPUB</title>
-    {''.join(f'<link rel="stylesheet" type="text/css" href="{Path(css).as_uri()}"/>' for css in sorted(all_css))}
+    {css_links}
     <style type="text/css">
     /* Chapter page breaks */
     .epub-chapter-break {{
@@ -284,6 +647,8 @@ def build_combined_html(spine, opf_dir, skip_cover=False):
         body {{
             orphans: 3;
             widows: 3;
+            text-rendering: optimizeSpeed;
+            -webkit-font-smoothing: none;
         }}
         img {{
             max-width: 100% !important;
@@ -300,42 +665,80 @@ def build_combined_html(spine, opf_dir, skip_cover=False):
     </style>
 </head>
 <body>
-{''.join(all_bodies)}
-</body>
-</html>"""
+"""
 
     # Save as .html (NOT .xhtml) - critical for Chromium compatibility
-    combined_path = os.path.join(opf_dir, '_combined_epub.html')
-    with open(combined_path, 'w', encoding='utf-8') as f:
-        f.write(combined_html)
-
-    return combined_path
-
+    # Written next to the OPF so relative image/font URLs still resolve
+    combined_dir = os.path.join(extract_dir, opf_dir)
+    os.makedirs(combined_dir, exist_ok=True)
+    combined_paths = []
+    for filename, group in zip(filenames, groups):
+        # Point links to chapters in other parts at that part's file
+        def to_part(m, filename=filename):
+            target = anchor_files.get(html.unescape(m.group(1)), filename)
+            return m.group(0) if target == filename else f'href="{target}#{m.group(1)}"'
+
+        # Hidden self-links make Chromium emit a named destination for every
+        # chapter, even ones only linked to from another part
+        anchor_index = ''.join(f'<a href="#{html.escape(anchors[index])}"></a>' for index in group)
+
+        # Stream chapter by chapter so only one is in memory at a time
+        combined_path = os.path.join(combined_dir, filename)
+        with open(combined_path, 'w', encoding='utf-8', buffering=WRITE_BUFFER_SIZE) as f:
+            f.write(head)
+            for index in group:
+                with open(body_paths[index], 'r', encoding='utf-8') as chapter:
+                    body = chapter.read()
+                if len(groups) > 1:
+                    body = _ANCHOR_HREF_RE.sub(to_part, body)
+                f.write(body)
+            f.write(f'<div hidden>{anchor_index}</div>\n</body>\n</html>')
+        combined_paths.append(combined_path)
+
+    return combined_paths
+
+
+def render_to_pdf(html_paths, output_pdf_paths):
+    """Render HTML files to PDFs using a one-off headless Chromium.
+
+    See EpubConverter.render_to_pdf; use an EpubConverter directly to
+    reuse one browser across several books.
+    """
+    with EpubConverter() as converter:
+        return converter.render_to_pdf(html_paths, output_pdf_paths)
 
-def render_to_pdf(html_path, output_pdf_path):
-    """Render a single HTML file to PDF using headless Chromium.
 
-    Uses Chromium's print-to-PDF engine for pixel-perfect rendering
-    of HTML, CSS, SVG, fonts, and images - the same engine Calibre uses
-    (Qt WebEngine is also Chromium-based).
-    """
-    print("  Launching Chromium...")
+async def _render_all(browser, html_paths, output_pdf_paths):
+    context = await browser.new_context(viewport=PAGE_VIEWPORT)
+    try:
+        print("  Rendering PDF with Chromium print engine...")
+        tasks = [asyncio.ensure_future(_render_page(context, html_path, output_pdf_path))
+                 for html_path, output_pdf_path in zip(html_paths, output_pdf_paths)]
+        try:
+            await asyncio.gather(*tasks)
+        except BaseException:
+            # The converter's loop outlives this book, so don't leave the
+            # other parts rendering in the background
+            for task in tasks:
+                task.cancel()
+            await asyncio.gather(*tasks, return_exceptions=True)
+            raise
+    finally:
+        await context.close()
 
-    with sync_playwright() as pw:
-        browser = pw.chromium.launch(headless=True)
-        # Set viewport to match page dimensions at 96 DPI (Chromium default)
-        # This prevents small-screen @media queries from activating
-        page = browser.new_page(viewport={'width': 528, 'height': 816})
 
-        file_url = Path(html_path).as_uri()
-        print(f"  Loading combined HTML ({os.path.getsize(html_path) / 1024:.0f} KB)...")
-        page.goto(file_url, wait_until='networkidle', timeout=120000)
+async def _render_page(context, html_path, output_pdf_path):
+    page = await context.new_page()
+    try:
+        # Everything is local, so 'load' (stylesheets and images done) is
+        # enough; networkidle would just idle 500ms for nothing.
+        await page.goto(Path(html_path).as_uri(), wait_until='load', timeout=120000)
 
-        # Wait for fonts and images to load
-        page.wait_for_timeout(2000)
+        # Wait for web fonts, then one frame so layout uses them
+        await page.evaluate('async () => { await document.fonts.ready; '
+                            'await new Promise(r => requestAnimationFrame(r)); }')
 
-        print("  Rendering PDF with Chromium print engine...")
-        page.pdf(
+        await page.pdf(
             path=str(output_pdf_path),
             width='5.5in',
             height='8.5in',
@@ -346,128 +749,306 @@ def render_to_pdf(html_path, output_pdf_path):
                 'right': '0.65in',
             },
             print_background=True,
-            outline=True,
+            outline=False,
         )
+    finally:
+        await page.close()
+
+
+def _outline_items(entries, dests, page_numbers):
+    """Build pikepdf OutlineItems for TOC entries that resolve to a page."""
+    items = []
+    for title, anchor, children in entries:
+        dest = dests.get('/' + anchor) if anchor else None
+        page = page_numbers.get(dest[0].objgen) if dest is not None else None
+        kids = _outline_items(children, dests, page_numbers)
+        if page is None:
+            if not kids:
+                continue
+            page = kids[0].destination
+        item = pikepdf.OutlineItem(title, page)
+        item.children.extend(kids)
+        items.append(item)
+    return items
+
+
+def merge_pdfs(pdf_paths, output_path, metadata=None, toc=None):
+    """Concatenate PDFs with pikepdf (qpdf), keeping TOC links and bookmarks.
+
+    Chromium writes named destinations to the catalog's /Dests dictionary
+    and its link annotations refer to them by name, so the /Dests entries
+    are carried over with the pages (copying pages alone drops them and
+    breaks internal links). file:// links whose fragment names one of
+    those destinations (links between parts of a split book) become
+    internal links.
+
+    The outline (bookmarks) is built from ``toc``, the EPUB table of
+    contents from parse_toc(): each entry points at the page holding its
+    chapter's named destination. Entries whose chapter has no destination
+    are dropped unless they have children.
+
+    Returns the page count of each input, in order.
+    """
+    page_counts = []
+    sources = []
+    try:
+        with pikepdf.Pdf.new() as out:
+            dests = pikepdf.Dictionary()
+
+            for path in pdf_paths:
+                # Sources stay open until save: qpdf copies stream data lazily
+                src = pikepdf.Pdf.open(path)
+                sources.append(src)
+                first_page = len(out.pages)
+                with warnings.catch_warnings():
+                    # Named destinations are carried over explicitly below
+                    warnings.filterwarnings('ignore', message='Copying pages from another Pdf')
+                    out.pages.extend(src.pages)
+                page_counts.append(len(src.pages))
+
+                # The pages are already copied, so page references inside
+                # these objects resolve to the copies in the output
+                if '/Dests' in src.Root:
+                    renamed = {}
+                    for name, dest in out.copy_foreign(src.make_indirect(src.Root.Dests)).items():
+                        if name in dests:
+                            # Ids like footnote "fn1" repeat across parts: the
+                            # first part keeps the name, later parts get their
+                            # own so their links stay within the part
+                            new_name = f'{name}~{len(sources)}'
+                            while new_name in dests:
+                                new_name += '~'
+                            renamed[name] = new_name
+                            name = new_name
+                        dests[name] = dest
+                    for page in out.pages[first_page:] if renamed else ():
+                        for annot in page.get('/Annots', ()):
+                            target = annot.get('/Dest')
+                            if isinstance(target, pikepdf.Name) and str(target) in renamed:
+                                annot.Dest = pikepdf.Name(renamed[str(target)])
+
+            if len(dests):
+                out.Root.Dests = out.make_indirect(dests)
+                for page in out.pages:
+                    for annot in page.get('/Annots', ()):
+                        action = annot.get('/A')
+                        if action is None or action.get('/S') != pikepdf.Name.URI:
+                            continue
+                        target, _, fragment = str(action.get('/URI', '')).partition('#')
+                        name = '/' + urllib.parse.unquote(fragment)
+                        if target.startswith('file:') and fragment and name in dests:
+                            annot.Dest = pikepdf.Name(name)
+                            del annot.A
+
+            if toc:
+                page_numbers = {page.objgen: index for index, page in enumerate(out.pages)}
+                with out.open_outline() as outline:
+                    outline.root.extend(_outline_items(toc, dests, page_numbers))
+
+            if metadata:
+                out.docinfo['/Title'] = metadata.get('title', '')
+                out.docinfo['/Author'] = metadata.get('creator', '')
+                out.docinfo['/Producer'] = 'EPUB to PDF Converter (Chromium/Playwright)'
+
+            out.save(str(output_path))
+    finally:
+        for src in sources:
+            src.close()
 
-        page.close()
-        browser.close()
+    return page_counts
 
-    return str(output_pdf_path)
 
+class EpubConverter:
+    """EPUB to PDF converter that keeps one headless Chromium running.
 
-def epub_to_pdf(epub_path, pdf_path=None):
-    """Convert an EPUB file to PDF using Chromium rendering.
-
-    Pipeline (mirrors Calibre's approach):
-    1. Extract EPUB (it's just a ZIP)
-    2. Parse OPF manifest and spine for reading order
-    3. Extract cover image and create a full-bleed cover page
-    4. Combine all chapters into a single HTML with internal anchor links
-    5. Render the combined HTML to PDF via headless Chromium
-    6. Prepend the cover page and add metadata
-    """
-    epub_path = Path(epub_path).resolve()
-    if pdf_path is None:
-        pdf_path = epub_path.with_suffix('.pdf')
-    else:
-        pdf_path = Path(pdf_path).resolve()
-
-    print(f"EPUB to PDF Converter (Chromium-based)")
-    print(f"{'='*50}")
-    print(f"Input:  {epub_path}")
-    print(f"Output: {pdf_path}")
-    print()
+    Launching Chromium costs a second or two, so batch conversions should
+    share a converter instead of calling the module-level epub_to_pdf()
+    for every book::
 
-    extract_dir = tempfile.mkdtemp(prefix="epub2pdf_extract_")
-    try:
-        # Step 1: Extract EPUB
-        print("Step 1: Extracting EPUB...")
-        extract_epub(str(epub_path), extract_dir)
-
-        # Step 2: Parse OPF
-        print("Step 2: Parsing OPF manifest...")
-        spine, manifest, metadata, opf_dir, cover_image_path = parse_opf(extract_dir)
-        print(f"  Title:    {metadata.get('title', 'Unknown')}")
-        print(f"  Author:   {metadata.get('creator', 'Unknown')}")
-        print(f"  Chapters: {len(spine)}")
-        if cover_image_path:
-            print(f"  Cover:    {os.path.basename(cover_image_path)}")
-        print()
+        with EpubConverter() as converter:
+            for path in epub_paths:
+                converter.epub_to_pdf(path)
+    """
 
-        # Step 3: Create cover page PDF
-        cover_pdf_path = None
-        if cover_image_path and os.path.exists(cover_image_path):
-            print("Step 3: Creating cover page...")
-            cover_pdf_path = os.path.join(extract_dir, '_cover.pdf')
-            create_cover_pdf(cover_image_path, cover_pdf_path)
-            print(f"  Cover page created")
+    def __init__(self):
+        self._loop = None
+        self._playwright = None
+        self.browser = None
+
+    def __enter__(self):
+        print("Launching Chromium...")
+        # Playwright's async API drives several pages of one browser at
+        # once; this loop is kept for the converter's lifetime.
+        self._loop = asyncio.new_event_loop()
+        try:
+            self._playwright = self._loop.run_until_complete(async_playwright().start())
+            self.browser = self._loop.run_until_complete(
+                self._playwright.chromium.launch(headless=True, args=CHROMIUM_ARGS))
+        except BaseException:
+            self.close()
+            raise
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+    def close(self):
+        """Shut down the browser and the Playwright driver."""
+        try:
+            if self.browser is not None:
+                self._loop.run_until_complete(self.browser.close())
+            if self._playwright is not None:
+                self._loop.run_until_complete(self._playwright.stop())
+        finally:
+            self.browser = None
+            self._playwright = None
+            if self._loop is not None:
+                self._loop.close()
+                self._loop = None
+
+    def render_to_pdf(self, html_paths, output_pdf_paths):
+        """Render HTML files to PDFs using headless Chromium.
+
+        Uses Chromium's print-to-PDF engine for pixel-perfect rendering
+        of HTML, CSS, SVG, fonts, and images - the same engine Calibre uses
+        (Qt WebEngine is also Chromium-based).
+
+        Each HTML file is printed in its own page of the browser. Layout
+        and painting are single-threaded per page, so rendering several
+        parts at once spreads the work over multiple cores.
+        """
+        total_kb = sum(os.path.getsize(path) for path in html_paths) / 1024
+        print(f"  Loading combined HTML ({total_kb:.0f} KB in {len(html_paths)} part(s))...")
+        self._loop.run_until_complete(_render_all(self.browser, html_paths, output_pdf_paths))
+        return [str(path) for path in output_pdf_paths]
+
+    def epub_to_pdf(self, epub_path, pdf_path=None):
+        """Convert an EPUB file to PDF using Chromium rendering.
+
+        Pipeline (mirrors Calibre's approach):
+        1. Open the EPUB (it's just a ZIP) and extract its linked assets
+        2. Parse OPF manifest and spine for reading order
+        3. Extract cover image and create a full-bleed cover page
+        4. Combine all chapters into a single HTML with internal anchor links
+        5. Render the combined HTML to PDF via headless Chromium
+        6. Prepend the cover page, add bookmarks from the EPUB TOC and metadata
+        """
+        epub_path = Path(epub_path).resolve()
+        if pdf_path is None:
+            pdf_path = epub_path.with_suffix('.pdf')
         else:
-            print("Step 3: No cover image found, skipping cover page")
-        print()
+            pdf_path = Path(pdf_path).resolve()
 
-        # Step 4: Combine all chapters into single HTML
-        print("Step 4: Combining chapters into single HTML...")
-        has_cover = cover_pdf_path is not None
-        combined_html_path = build_combined_html(spine, opf_dir, skip_cover=has_cover)
-        print(f"  Combined {len(spine)} chapters")
-        print(f"  Internal TOC links rewritten to anchors")
+        print(f"EPUB to PDF Converter (Chromium-based)")
+        print(f"{'='*50}")
+        print(f"Input:  {epub_path}")
+        print(f"Output: {pdf_path}")
         print()
 
-        # Step 5: Render combined HTML to PDF via Chromium
-        print("Step 5: Rendering with Chromium...")
-        content_pdf_path = os.path.join(extract_dir, '_content.pdf')
-        render_to_pdf(combined_html_path, content_pdf_path)
-        print()
+        extract_dir = tempfile.mkdtemp(prefix="epub2pdf_extract_")
+        zf = None
+        try:
+            # The archive stays open for the whole pipeline so chapters can be
+            # read straight from it instead of round-tripping through the disk.
+            zf = zipfile.ZipFile(epub_path, 'r')
+            # One pass over the central directory instead of a lookup per item
+            members = archive_members(zf)
+
+            # Step 1: Extract linked assets
+            print("Step 1: Extracting EPUB assets...")
+            extract_epub(zf, extract_dir)
+
+            # Step 2: Parse OPF
+            print("Step 2: Parsing OPF manifest...")
+            spine, manifest, metadata, opf_dir, cover_image_path, toc = parse_opf(zf, members)
+            print(f"  Title:    {metadata.get('title', 'Unknown')}")
+            print(f"  Author:   {metadata.get('creator', 'Unknown')}")
+            print(f"  Chapters: {len(spine)}")
+            if cover_image_path:
+                print(f"  Cover:    {os.path.basename(cover_image_path)}")
+            print()
+
+            # Step 3: Create cover page PDF
+            cover_pdf_path = None
+            if cover_image_path:
+                print("Step 3: Creating cover page...")
+                cover_pdf_path = os.path.join(extract_dir, '_cover.pdf')
+                create_cover_pdf(os.path.join(extract_dir, cover_image_path), cover_pdf_path)
+                print(f"  Cover page created")
+            else:
+                print("Step 3: No cover image found, skipping cover page")
+            print()
+
+            # Step 4: Combine all chapters into single HTML
+            print("Step 4: Combining chapters into single HTML...")
+            has_cover = cover_pdf_path is not None
+            combined_html_paths = build_combined_html(zf, spine, opf_dir, extract_dir, skip_cover=has_cover,
+                                                      max_chunks=os.cpu_count() or 1, members=members)
+            print(f"  Combined {len(spine)} chapters")
+            if len(combined_html_paths) > 1:
+                print(f"  Split into {len(combined_html_paths)} parts for parallel rendering")
+            print(f"  Internal TOC links rewritten to anchors")
+            print()
+
+            # Step 5: Render combined HTML to PDF via Chromium
+            print("Step 5: Rendering with Chromium...")
+            content_pdf_paths = [os.path.join(extract_dir, f'_content_{k}.pdf')
+                                 for k in range(len(combined_html_paths))]
+            self.render_to_pdf(combined_html_paths, content_pdf_paths)
+            print()
+
+            # Step 6: Merge cover + content and add metadata
+            print("Step 6: Merging final PDF...")
+            pdf_paths = list(content_pdf_paths)
+            if has_cover:
+                pdf_paths.insert(0, cover_pdf_path)
+            page_counts = merge_pdfs(pdf_paths, pdf_path, metadata, toc)
+            if has_cover:
+                print(f"  Added cover page")
+            print(f"  Added {sum(page_counts[-len(content_pdf_paths):])} content pages")
+
+            # Report
+            size_mb = pdf_path.stat().st_size / (1024 * 1024)
+            total_pages = sum(page_counts)
+            print(f"\n{'='*50}")
+            print(f"Done! PDF saved to: {pdf_path}")
+            print(f"  Total pages: {total_pages}")
+            print(f"  File size:   {size_mb:.2f} MB")
+
+        finally:
+            if zf is not None:
+                zf.close()
+            shutil.rmtree(extract_dir, ignore_errors=True)
+
+        return str(pdf_path)
 
-        # Step 6: Merge cover + content and add metadata
-        print("Step 6: Merging final PDF...")
-        writer = PdfWriter()
-
-        # Add cover page first (if exists)
-        if cover_pdf_path and os.path.exists(cover_pdf_path):
-            writer.append(cover_pdf_path)
-            print(f"  Added cover page")
-
-        # Append content PDF - using append() preserves named destinations
-        # and link annotations, which is critical for working TOC links.
-        # (add_page() drops named destinations, breaking internal links)
-        content_reader = PdfReader(content_pdf_path)
-        writer.append(content_pdf_path)
-        print(f"  Added {len(content_reader.pages)} content pages")
-
-        # Add metadata
-        if metadata:
-            writer.add_metadata({
-                '/Title': metadata.get('title', ''),
-                '/Author': metadata.get('creator', ''),
-                '/Producer': 'EPUB to PDF Converter (Chromium/Playwright)',
-            })
-
-        writer.write(str(pdf_path))
-        writer.close()
-
-        # Report
-        size_mb = pdf_path.stat().st_size / (1024 * 1024)
-        total_pages = (1 if cover_pdf_path else 0) + len(content_reader.pages)
-        print(f"\n{'='*50}")
-        print(f"Done! PDF saved to: {pdf_path}")
-        print(f"  Total pages: {total_pages}")
-        print(f"  File size:   {size_mb:.2f} MB")
 
-    finally:
-        shutil.rmtree(extract_dir, ignore_errors=True)
+def epub_to_pdf(epub_path, pdf_path=None):
+    """Convert a single EPUB file to PDF with a one-off Chromium instance.
 
-    return str(pdf_path)
+    See EpubConverter.epub_to_pdf for the pipeline.
+    """
+    with EpubConverter() as converter:
+        return converter.epub_to_pdf(epub_path, pdf_path)
 
 
 if __name__ == "__main__":
     if len(sys.argv) < 2:
         print("Usage: python epub_to_pdf.py <input.epub> [output.pdf]")
+        print("       python epub_to_pdf.py <book1.epub> <book2.epub> ...")
         print()
         print("Converts EPUB to PDF using headless Chromium (same approach as Calibre).")
         print("All processing is done locally - no data is sent online.")
         sys.exit(1)
 
-    input_file = sys.argv[1]
-    output_file = sys.argv[2] if len(sys.argv) > 2 else None
-    epub_to_pdf(input_file, output_file)
+    args = sys.argv[1:]
+    if len(args) > 1 and all(arg.lower().endswith('.epub') for arg in args):
+        # Batch mode: every book shares one Chromium instance
+        with EpubConverter() as converter:
+            for input_file in args:
+                converter.epub_to_pdf(input_file)
+                print()
+    else:
+        input_file = args[0]
+        output_file = args[1] if len(args) > 1 else None
+        epub_to_pdf(input_file, output_file)